@@ -1,15 +1,11 @@
 from pydantic import BaseModel
-from .mem_manager import MemManagerImpl
-from .replicas_manager import ReplicasManagerImpl
 from .jotun_model import ModelInterface
+from .registry import ModelRegistry, get_registry
 
 class Customizer:
       
-    def __init__(self):
-        self.model_registry = {
-                "mem_manager": MemManagerImpl,
-                "replicas_manager": ReplicasManagerImpl,
-            }
+    def __init__(self, registry: ModelRegistry = None):
+        self.model_registry = (registry or get_registry()).impls
 
     def get_request_model(self, model_name: str):
         return self.model_registry[model_name]().get_request_model()
@@ -27,9 +23,15 @@ class Customizer:
     def validate_features(self, model_name: str, model, request_dict):
          return self.model_registry[model_name]().validate_features(model, request_dict)
 
-    def train_and_save(self, model_name, model, dataset, save_path):
+    def get_partition_columns(self, model_name: str):
+        return self.model_registry[model_name]().get_partition_columns()
+
+    def get_partition_fields(self, model_name: str, request_dict):
+        return self.model_registry[model_name]().get_partition_fields(request_dict)
+
+    def train_and_save(self, model_name, model, dataset, save_path, export_name=None):
             trainer = self.model_registry[model_name]().get_trainer_class()(model, dataset)
-            trainer.train_and_save(model_name,save_path)
+            trainer.train_and_save(export_name or model_name,save_path)
 
     def validate(self, model_name):
         if model_name not in self.model_registry:
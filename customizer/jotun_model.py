@@ -96,4 +96,29 @@ class ModelInterface(ABC):
         """
         pass
 
+    def get_partition_columns(self) -> Any:
+        """
+        Optional method returning the dataset columns holding the namespace and the deployment name.
+
+        When partitioned mode is enabled (`JOTUN_PARTITION_BY`), the dataset is split on these columns
+        and one small model is trained per partition. Models returning None are always trained and
+        served as a single global model.
+
+        Returns:
+            Any: A list with the namespace column and the deployment column, or None if the model
+                 cannot be partitioned.
+        """
+        return None
 
+    def get_partition_fields(self, request_dict: Any) -> Any:
+        """
+        Optional method returning the namespace and the deployment name of a request, which are used
+        to route the prediction to the model of the matching partition.
+
+        Args:
+            request_dict (Any): The validated request model instance.
+
+        Returns:
+            Any: A tuple with the namespace and the deployment name, or None if the model cannot be partitioned.
+        """
+        return None
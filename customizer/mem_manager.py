@@ -1,4 +1,3 @@
-from model_trainer.model_trainer import ModelTrainer
 from pydantic import BaseModel
 from .jotun_model import ModelInterface
 
@@ -15,6 +14,8 @@ class MemManagerTrainer:
         self.dataset = dataset
 
     def train_and_save(self, model_name, save_path):
+        # Imported here so that serving the models does not pull in pandas at startup
+        from model_trainer.model_trainer import ModelTrainer
         trainer = ModelTrainer(self.model, self.dataset)
         trainer.load_dataset(x_cols=["namespace", "deployments","requestsCount", "time"], y_cols=["cpu", "memory"])
         trainer.train_and_save(model_name, save_path)
@@ -34,6 +35,12 @@ class MemManagerImpl(ModelInterface):
     def get_prediction_features(self, request: MemManagerRequest):
         return [[request.namespace, request.deployment, request.requestsCount, request.time]]
     
+    def get_partition_columns(self):
+        return ["namespace", "deployments"]
+
+    def get_partition_fields(self, request_dict):
+        return request_dict.namespace, request_dict.deployment
+
     def validate_features(self, model, request_dict):
         errors = []
         namespace_classes = model.named_steps['model'].named_steps['preprocessor'].transformers_[1][1].encoders[0].classes_
@@ -0,0 +1,173 @@
+import importlib.util
+import inspect
+import sys
+import types
+import zlib
+from importlib.metadata import entry_points
+from pathlib import Path
+from utils.settings import PLUGIN_DIR, SHARD_COUNT, SHARD_INDEX
+from .jotun_model import ModelInterface
+from .mem_manager import MemManagerImpl
+from .replicas_manager import ReplicasManagerImpl
+
+# Third party packages can ship their own models by exposing the implementation class
+# under this entry point group, e.g. in pyproject.toml:
+#
+#   [project.entry-points."jotun.models"]
+#   team_cache = "team_models.cache:TeamCacheImpl"
+#
+ENTRY_POINT_GROUP = "jotun.models"
+
+# Plugin files are imported as modules of this package, e.g. `jotun_plugins.team_cache`,
+# so the classes they define (custom transformers, estimators, ...) can be pickled with the
+# model artifacts and unpickled once the registry has been built.
+PLUGIN_PACKAGE = "jotun_plugins"
+
+BUILTIN_MODELS = {
+    "mem_manager": MemManagerImpl,
+    "replicas_manager": ReplicasManagerImpl,
+}
+
+def shard_of(model_name : str, shard_count : int) -> int:
+    """
+    Returns the shard a model belongs to.
+
+    A stable checksum of the model name is used instead of `hash()` so that every worker
+    computes the same shard regardless of the interpreter hash seed.
+
+    Parameters:
+    - model_name (str): The name of the model.
+    - shard_count (int): The total number of shards.
+
+    Returns:
+    - int: The shard index of the model, between 0 and shard_count - 1.
+    """
+    return zlib.crc32(model_name.encode("utf-8")) % shard_count
+
+
+class ModelRegistry:
+    """
+    Discovers the available `ModelInterface` implementations and keeps the ones served by this worker.
+
+    Description:
+    The implementations are collected, in order, from the built-in models, the `jotun.models`
+    entry point group and the plugin directory, where each `<model_name>.py` file defines one
+    implementation. A later source overrides an earlier one with the same model name.
+
+    Only the implementations whose model artifact (`<models_dir>/<model_name>.pkl`) exists and whose
+    name falls into the shard of this worker are kept, so each worker holds just its subset of the
+    models in memory.
+
+    Attributes:
+    - available (dict): Every discovered implementation, keyed by model name.
+    - impls (dict): The implementations served by this worker, keyed by model name.
+    """
+
+    def __init__(self, models_dir : str = "./models", plugin_dir : str = None, shard_index : int = 0, shard_count : int = 1):
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}.")
+        self.models_dir = Path(models_dir)
+        self.plugin_dir = plugin_dir
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.available = self.discover()
+        self.impls = { name: clasz for name, clasz in self.available.items() if self.is_served(name) }
+        print(f"Serving models {sorted(self.impls)} (shard {shard_index} of {shard_count}).")
+
+    @property
+    def names(self) -> set:
+        return set(self.impls)
+
+    def discover(self) -> dict:
+        """
+        Collects the implementations from all sources.
+
+        Returns:
+        - dict: The model names mapped to their implementation classes.
+        """
+        discovered = dict(BUILTIN_MODELS)
+        discovered.update(self.__from_entry_points())
+        if self.plugin_dir:
+            discovered.update(self.__from_plugin_dir(self.plugin_dir))
+        return discovered
+
+    def is_served(self, model_name : str) -> bool:
+        """
+        Checks whether a model has a trained artifact and belongs to the shard of this worker.
+
+        Parameters:
+        - model_name (str): The name of the model.
+
+        Returns:
+        - bool: True if this worker should load and serve the model, False otherwise.
+        """
+        if shard_of(model_name, self.shard_count) != self.shard_index:
+            return False
+        return (self.models_dir / f"{model_name}.pkl").exists()
+
+    def __from_entry_points(self) -> dict:
+        discovered = {}
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                clasz = entry_point.load()
+            except Exception as e:
+                print(f"Unable to load the model implementation from entry point {entry_point.name} :: {e}")
+                continue
+            if not inspect.isclass(clasz) or not issubclass(clasz, ModelInterface):
+                print(f"Entry point {entry_point.name} does not resolve to a {ModelInterface.__name__} implementation, skipping it.")
+                continue
+            discovered[entry_point.name] = clasz
+        return discovered
+
+    def __from_plugin_dir(self, plugin_dir : str) -> dict:
+        discovered = {}
+        package = sys.modules.get(PLUGIN_PACKAGE)
+        if package is None:
+            package = types.ModuleType(PLUGIN_PACKAGE)
+            sys.modules[PLUGIN_PACKAGE] = package
+        package.__path__ = [str(Path(plugin_dir).resolve())]
+        for plugin_file in sorted(Path(plugin_dir).glob("*.py")):
+            model_name = plugin_file.stem
+            module_name = f"{PLUGIN_PACKAGE}.{model_name}"
+            try:
+                spec = importlib.util.spec_from_file_location(module_name, plugin_file)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module      # registered first, so pickle finds the plugin classes
+                spec.loader.exec_module(module)
+            except Exception as e:
+                sys.modules.pop(module_name, None)
+                print(f"Unable to load the model implementation from {plugin_file} :: {e}")
+                continue
+            impls = [obj for obj in vars(module).values()
+                     if inspect.isclass(obj) and issubclass(obj, ModelInterface) and obj.__module__ == module.__name__]
+            if len(impls) != 1:
+                print(f"{plugin_file} must define exactly one {ModelInterface.__name__} implementation, found {len(impls)}.")
+                continue
+            discovered[model_name] = impls[0]
+        return discovered
+
+
+__registry = None
+
+def reload_registry(models_dir : str = "./models") -> ModelRegistry:
+    """
+    Builds the registry of this worker from the environment settings and the artifacts of `models_dir`,
+    and makes it the registry returned by `get_registry`.
+
+    The model reload calls it so that the artifacts created since the last reload are picked up.
+
+    Parameters:
+    - models_dir (str): The directory containing the model artifacts.
+
+    Returns:
+    - ModelRegistry: The new registry.
+    """
+    global __registry
+    __registry = ModelRegistry(models_dir, PLUGIN_DIR, SHARD_INDEX, SHARD_COUNT)
+    return __registry
+
+def get_registry() -> ModelRegistry:
+    """
+    Returns the registry of this worker, built from `./models` on first use.
+    """
+    return __registry if __registry is not None else reload_registry()
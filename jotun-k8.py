@@ -16,17 +16,31 @@
 # any permissions or questions regarding usage and licensing.
 # Email: prajapatiabhishek1996@gmail.com
 
+import time
+IMPORT_STARTED = time.perf_counter()
+
 from loaders.models import get_models
+from loaders.partitions import PartitionCache
+from shadow.shadow import ShadowEvaluator
+from customizer.registry import get_registry, reload_registry
 from fastapi import FastAPI
 from routers.routers import router 
+from routers.admin import admin_router
+from profiling.profiler import TARGETS, ProfileSession, profiler
 from contextlib import asynccontextmanager
 from updater.updater import JotunUpdater
-from apscheduler.schedulers.background import BackgroundScheduler
 from utils.db import JotunDBUtils
+from utils.settings import (FAST_START, PARTITION_CACHE_SIZE, SHADOW_WINDOW_MINUTES, SHADOW_SAMPLE_RATE,
+                            SHADOW_QUEUE_SIZE, TRACKED_PREDICTIONS, PROFILE_DIR)
+from utils.timings import StartupTimings
+import signal
 import sys
+import threading
 from sqlite3 import Error
 from exceptions.exceptions import GracefulShutdown
 
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
 
 def prerequiste() -> Error:
     """
@@ -56,6 +70,21 @@ def prerequiste() -> Error:
     if table_create_err:
         return table_create_err
 
+def toggle_profiling(signum, frame):
+    """
+    Signal handler starting a profiling session of every target for 60 seconds, or stopping the
+    running one. The work is done in a separate thread so the handler never waits on a lock.
+
+    Usage:
+        kill -USR1 <pid>
+    """
+    def toggle():
+        if profiler.session is not None and profiler.session.sampler.is_alive():
+            profiler.stop()
+        else:
+            profiler.start(ProfileSession(list(TARGETS), 60, None, PROFILE_DIR))
+    threading.Thread(target=toggle, daemon=True).start()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -63,27 +92,64 @@ async def lifespan(app: FastAPI):
     This context manager is used to load models into memory, perform prerequisite checks, start a model 
     update process, and gracefully shut down the application if needed.
 
+    When `JOTUN_FAST_START` is enabled, the models already present on disk are served right away and the
+    first update check runs in the background once the application reports ready. The duration of each
+    startup phase is recorded and exposed through the `/startup` endpoint.
+
     Parameters:
     - app (FastAPI): The FastAPI application instance.
 
     """
-    app.state.models = get_models("./models")       # Loads the model in the memory
+    timings = StartupTimings()
+    timings.record("imports", IMPORT_SECONDS)
+    app.state.timings = timings
+    with timings.phase("load_models"):
+        app.state.models = get_models("./models", get_registry().names)       # Loads the model in the memory
+    app.state.partitions = PartitionCache("./models", PARTITION_CACHE_SIZE)     # Partition models are loaded on demand
+    app.state.shadows = ShadowEvaluator("./models", SHADOW_WINDOW_MINUTES, SHADOW_SAMPLE_RATE, SHADOW_QUEUE_SIZE, TRACKED_PREDICTIONS)
+    app.state.shadows.refresh(app.state.models)
+    app.state.shadows.start()
     try:
-        prerequisteErr = prerequiste()                  # performs pre-activities like hash tracker table creation
+        with timings.phase("prerequisite"):
+            prerequisteErr = prerequiste()                  # performs pre-activities like hash tracker table creation
         if prerequisteErr:
             raise GracefulShutdown(prerequisteErr)
         
+        app.state.update_lock = threading.Lock()       # also held by the rollback route while it swaps a model
         def update():
-            updater = JotunUpdater(app.state.models)
-            isUpdated = updater.update()
-            if isUpdated:
-                print("One or more models have been updated. Reloading the models...")
-                app.state.models.clear()
-                app.state.models = get_models("./models") 
-        update()       
+            update_lock = app.state.update_lock
+            if not update_lock.acquire(blocking=False):
+                print("Update check is already running. Skipping this run.")
+                return
+            try:
+                reload_registry("./models")     # re-evaluates which models have an artifact and are served
+                updater = JotunUpdater(app.state.models)
+                isUpdated = updater.update()
+                if isUpdated or get_registry().names != set(app.state.models):
+                    print("One or more models have been updated. Reloading the models...")
+                    app.state.models = get_models("./models", get_registry().names)   # swapped in one go so in-flight requests keep a complete dict
+                    app.state.partitions.clear()
+                    app.state.shadows.refresh(app.state.models)     # previous versions of the retrained models become shadows
+            finally:
+                update_lock.release()
+
+        def initial_update():
+            with timings.phase("initial_update"):
+                update()
+
+        from apscheduler.schedulers.background import BackgroundScheduler
         scheduler = BackgroundScheduler()
+        if FAST_START:
+            scheduler.add_job(initial_update, 'date', id='initial_update')     # runs right after the scheduler starts
+        else:
+            initial_update()
         scheduler.add_job(update, 'interval', minutes=15, id='update_models')
         scheduler.start()
+        try:
+            signal.signal(signal.SIGUSR1, toggle_profiling)
+        except (AttributeError, ValueError):
+            print("Profiling signal handler is not available on this platform or thread.")
+        timings.record("time_to_ready", time.perf_counter() - IMPORT_STARTED)
         yield
     except GracefulShutdown as e:
         print(f"{e}")
@@ -114,5 +180,23 @@ async def display_models():
     """
     return {"models": list(app.state.models.keys())}
 
+@app.get("/startup",tags=["startup"])
+async def display_startup_timings():
+    """
+    Endpoint to display how long each startup phase of the application took.
+
+    Returns:
+        dict: A dictionary containing a key "fast_start" telling whether the first update check was
+              moved to the background, and a key "phases" with the duration of each phase in seconds.
+    
+    Example response:
+    {
+        "fast_start": true,
+        "phases": {"imports": 1.204, "load_models": 0.512, "prerequisite": 0.004, "time_to_ready": 1.73}
+    }
+    """
+    return {"fast_start": FAST_START, "phases": app.state.timings.as_dict()}
+
 # Include the router for model-related endpoints
 app.include_router(router, prefix="/models", tags=["models"])
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
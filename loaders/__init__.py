@@ -1,3 +1,5 @@
 from pathlib import Path
+from collections import OrderedDict
+import threading
 import joblib
-import filelock
\ No newline at end of file
+import filelock
@@ -36,12 +36,40 @@ def __get_model_obj(filename : str):
         with open(filename, "rb") as model:
             return joblib.load(model)
     
-def get_models(directory : str):
+def get_previous_model_file(directory : str, model_name : str) -> Path:
+    """
+    This function returns the path where the previous version of a model is kept after a retrain.
+
+    Parameters:
+    - directory (str): The path to the directory containing the model files.
+    - model_name (str): The name of the model.
+
+    Returns:
+    - Path: The path `<directory>/previous/<model_name>.pkl`. It is outside of the files loaded by
+      `get_models`, so the previous versions are only loaded on demand.
+    """
+    return Path(directory) / "previous" / f"{model_name}.pkl"
+
+def get_model(filename : str):
+    """
+    This function loads a single machine learning model file, using the same file lock as the trainer.
+
+    Parameters:
+    - filename (str): The path to the file containing the serialized machine learning model.
+
+    Returns:
+    - object: The loaded machine learning model object.
+    """
+    return __get_model_obj(filename)
+
+def get_models(directory : str, names : set = None):
     """
     This function retrieves and loads all machine learning models from a specified directory.
 
     Parameters:
     - directory (str): The path to the directory containing the model files.
+    - names (set): Optional set of model names to load. The other model files are skipped, which keeps
+      the models served by other workers out of memory. All the model files are loaded when omitted.
 
     Returns:
     - dict: A dictionary where the keys are the model names (without extensions) and the values are 
@@ -51,4 +79,4 @@ def get_models(directory : str):
     - This function assumes the files in the directory are valid model files serialized with `joblib`.
     """
     model_files = __get_model_files(directory)
-    return { Path(model.name).stem: __get_model_obj(model) for model in model_files}
\ No newline at end of file
+    return { Path(model.name).stem: __get_model_obj(model) for model in model_files if names is None or Path(model.name).stem in names }
\ No newline at end of file
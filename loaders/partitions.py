@@ -0,0 +1,62 @@
+from loaders import *
+from loaders.models import get_model
+from utils.partitions import is_valid_partition
+
+class PartitionCache:
+    """
+    Least recently used cache of the partition models loaded in memory.
+
+    Description:
+    In partitioned mode every model has one small artifact per partition, stored as
+    `<directory>/<model_name>/<partition>.pkl`. Only the most recently used partitions are kept
+    loaded, so the memory footprint stays bounded however many namespaces the cluster has.
+
+    Methods:
+        - get: Returns the model of a partition, loading it when it is not cached yet.
+        - clear: Drops every loaded partition, e.g. after the partitions have been retrained.
+    """
+
+    def __init__(self, directory : str, capacity : int):
+        """
+        Parameters:
+        - directory (str): The directory containing the model artifacts.
+        - capacity (int): The maximum number of partition models kept in memory.
+        """
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.models = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, model_name : str, partition : str):
+        """
+        Returns the model trained for a partition.
+
+        Parameters:
+        - model_name (str): The name of the model.
+        - partition (str): The name of the partition.
+
+        Returns:
+        - object: The loaded partition model, or None if no model was trained for the partition,
+          in which case the caller falls back to the global model.
+        """
+        if not is_valid_partition(partition):
+            return None
+        cache_key = (model_name, partition)
+        with self.lock:
+            if cache_key in self.models:
+                self.models.move_to_end(cache_key)
+                return self.models[cache_key]
+        model_file = self.directory / model_name / f"{partition}.pkl"
+        if not model_file.exists():
+            return None
+        model = get_model(model_file)
+        with self.lock:
+            self.models[cache_key] = model
+            self.models.move_to_end(cache_key)
+            while len(self.models) > self.capacity:
+                self.models.popitem(last=False)
+        return model
+
+    def clear(self):
+        with self.lock:
+            self.models.clear()
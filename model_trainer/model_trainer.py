@@ -1,9 +1,18 @@
-from pandas import read_csv
+from pandas import read_csv, DataFrame
 import joblib
+from sklearn.base import clone
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 import os
 import filelock
+from loaders.models import get_previous_model_file
+from profiling.profiler import profiled
+
+def base_estimator(model):
+    """Returns the estimator wrapped by the single step 'model' pipelines of a trained artifact."""
+    while isinstance(model, Pipeline) and [name for name, _ in model.steps] == ['model']:
+        model = model.named_steps['model']
+    return model
 
 class ModelTrainer:
 
@@ -16,9 +25,10 @@ class ModelTrainer:
         self.columns = []  # Store column names for X and Y
         self.preprocessor = None
 
+    @profiled("train")
     def load_dataset(self, x_cols=None, y_cols=None):
-        """Load dataset and set x (features) and y (target)"""
-        self.df = read_csv(self.dataset_path)
+        """Load dataset (a CSV path or an already loaded DataFrame) and set x (features) and y (target)"""
+        self.df = self.dataset_path if isinstance(self.dataset_path, DataFrame) else read_csv(self.dataset_path)
         
         if x_cols is None or y_cols is None:
             raise ValueError("x_cols and y_cols must be specified.")
@@ -34,14 +44,21 @@ class ModelTrainer:
         print("Target (y):")
         print(self.y)
 
+    @profiled("train")
     def train_and_save(self, model_name, models_dir):
-        pipeline = Pipeline(steps=[('model', self.model)])
+        # Fit a fresh copy of the estimator: the loaded model keeps serving requests while training
+        pipeline = Pipeline(steps=[('model', clone(base_estimator(self.model)))])
         pipeline.fit(self.x, self.y)
+        os.makedirs(models_dir, exist_ok=True)
         export_file = os.path.join(models_dir, f'{model_name}.pkl')
         export_file_lock = os.path.join(models_dir, f'{model_name}.pkl.lock')
         export_file_tmp = os.path.join(models_dir, f'{model_name}_tmp.pkl')
         with open(export_file_tmp, 'wb') as file:
             joblib.dump(pipeline, file)
+        previous_file = get_previous_model_file(models_dir, model_name)
         with filelock.FileLock(export_file_lock):
+            if os.path.exists(export_file):     # keep the previous version for shadow evaluation and rollback
+                os.makedirs(previous_file.parent, exist_ok=True)
+                os.replace(export_file, previous_file)
             os.replace(export_file_tmp,export_file)
         print(f"Model trained and saved as '{export_file}'.")
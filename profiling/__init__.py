@@ -0,0 +1,12 @@
+import cProfile
+import functools
+import inspect
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
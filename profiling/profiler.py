@@ -0,0 +1,284 @@
+from profiling import *
+
+TARGETS = ("predict", "update", "train")
+
+def collapse_stack(frame, root : str) -> str:
+    """
+    Returns a stack in the collapsed format read by flamegraph tools, from the root to the given frame.
+
+    Parameters:
+    - frame (frame): The innermost frame of the stack.
+    - root (str): The name of the profiled section, used as the root of the stack.
+
+    Returns:
+    - str: The frames separated by ";", e.g. "predict;routers.py:predict;_pipeline.py:predict".
+    """
+    frames = []
+    while frame is not None:
+        frames.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join([root] + frames[::-1])
+
+
+class ProfileSession:
+    """
+    One bounded profiling run of the predict path, the dataset update and the training pipeline.
+
+    Description:
+    Every profiled section runs under its own `cProfile` profiler, and the results are merged into a single
+    pstats file. A sampler thread also records the stacks of the threads inside a profiled section at a fixed
+    interval, written as flamegraph-compatible collapsed stacks. When enabled, `tracemalloc` tracks the
+    allocations of the whole process during the session and a snapshot is dumped at the end.
+
+    The session ends when its duration elapses, when its request budget is used up, or when it is stopped.
+    The result files are then written to `<output_dir>/<start time>/`.
+    """
+
+    def __init__(self, targets : list, duration_seconds : float, max_requests : int, output_dir : str,
+                 sample_interval_ms : float = 5, trace_allocations : bool = True):
+        """
+        Parameters:
+        - targets (list): The sections to profile, among "predict", "update" and "train".
+        - duration_seconds (float): The maximum duration of the session.
+        - max_requests (int): The number of predict requests to profile, or None for no limit.
+        - output_dir (str): The directory where the result files are written.
+        - sample_interval_ms (float): The interval between two stack samples.
+        - trace_allocations (bool): Whether allocations are tracked with `tracemalloc`.
+        """
+        unknown_targets = set(targets) - set(TARGETS)
+        if unknown_targets:
+            raise ValueError(f"Unknown profiling targets {sorted(unknown_targets)}. Valid targets are {list(TARGETS)}")
+        if duration_seconds <= 0:
+            raise ValueError("duration_seconds must be greater than 0")
+        if sample_interval_ms <= 0:
+            raise ValueError("sample_interval_ms must be greater than 0")
+        if max_requests is not None and max_requests < 0:
+            raise ValueError("max_requests must not be negative")
+        self.targets = set(targets)
+        self.deadline = time.monotonic() + duration_seconds
+        self.remaining_requests = max_requests
+        self.sample_interval = sample_interval_ms / 1000
+        self.trace_allocations = trace_allocations
+        self.started_at = datetime.now()
+        self.output_dir = os.path.join(output_dir, self.started_at.strftime("%Y%m%dT%H%M%S"))
+        self.lock = threading.Lock()
+        self.active_threads = {}
+        self.stats = None
+        self.sections = Counter()
+        self.samples = Counter()
+        self.stopped = threading.Event()
+        self.files = []
+        self.dumped = False
+        self.started_tracemalloc = False
+        self.sampler = threading.Thread(target=self.__run, name="jotun-profiler", daemon=True)
+
+    def start(self):
+        self.started_tracemalloc = self.trace_allocations and not tracemalloc.is_tracing()
+        if self.started_tracemalloc:
+            tracemalloc.start(25)
+        self.sampler.start()
+        print(f"Profiling {sorted(self.targets)} into {self.output_dir}")
+
+    def stop(self):
+        self.stopped.set()
+
+    def is_done(self) -> bool:
+        with self.lock:
+            budget_used = self.remaining_requests is not None and self.remaining_requests <= 0 and not self.active_threads
+        return self.stopped.is_set() or budget_used or time.monotonic() >= self.deadline
+
+    def enter(self, target : str) -> bool:
+        """
+        Registers the current thread as running a profiled section.
+
+        Returns:
+        - bool: False if the section should not be profiled, because the target is not selected, the
+          session is over, or the thread is already inside a profiled section.
+        """
+        thread_id = threading.get_ident()
+        with self.lock:
+            if target not in self.targets or thread_id in self.active_threads or self.stopped.is_set():
+                return False
+            if time.monotonic() >= self.deadline:
+                return False
+            if target == "predict" and self.remaining_requests is not None:
+                if self.remaining_requests <= 0:
+                    return False
+                self.remaining_requests -= 1
+            self.active_threads[thread_id] = target
+            self.sections[target] += 1
+            return True
+
+    def leave(self, profile : cProfile.Profile):
+        """
+        Unregisters the current thread and merges the results of its section profiler.
+
+        A section still running when the session ends, e.g. a retrain outlasting the duration, leaves after
+        the results were written: the pstats file is then rewritten with its results.
+        """
+        with self.lock:
+            self.active_threads.pop(threading.get_ident(), None)
+            if profile is None:
+                return
+            try:
+                if self.stats is None:
+                    self.stats = pstats.Stats(profile)
+                else:
+                    self.stats.add(profile)
+            except TypeError:
+                return  # the section did not record any call
+            if self.dumped:
+                self.__write_stats()
+
+    def summary(self) -> dict:
+        with self.lock:
+            return {
+                "targets": sorted(self.targets),
+                "started_at": self.started_at.isoformat(),
+                "remaining_seconds": max(0, round(self.deadline - time.monotonic(), 1)),
+                "remaining_requests": self.remaining_requests,
+                "sections": dict(self.sections),
+                "samples": sum(self.samples.values()),
+                "output_dir": self.output_dir,
+                "files": list(self.files),
+            }
+
+    def __run(self):
+        try:
+            while not self.is_done():
+                time.sleep(self.sample_interval)
+                frames = sys._current_frames()
+                with self.lock:
+                    active_threads = dict(self.active_threads)
+                for thread_id, target in active_threads.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        self.samples[collapse_stack(frame, target)] += 1
+                del frames
+        finally:
+            self.stopped.set()      # no section enters the session once its results are being written
+            try:
+                self.__dump()
+            finally:
+                if self.started_tracemalloc and tracemalloc.is_tracing():
+                    tracemalloc.stop()
+
+    def __dump(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        files = []
+        with self.lock:
+            self.dumped = True
+            if self.stats is not None:
+                self.__write_stats()
+        files.append(os.path.join(self.output_dir, "cpu.collapsed"))
+        with open(files[-1], "w", encoding="utf-8") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+        if self.trace_allocations and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            files.append(os.path.join(self.output_dir, "alloc.tracemalloc"))
+            snapshot.dump(files[-1])
+            files.append(os.path.join(self.output_dir, "alloc_top.txt"))
+            with open(files[-1], "w", encoding="utf-8") as file:
+                for stat in snapshot.statistics("traceback")[:50]:
+                    file.write(f"{stat}\n")
+                    file.write("\n".join(stat.traceback.format()) + "\n\n")
+        with self.lock:
+            self.files = self.files + files
+        print(f"Profiling results written to {self.output_dir}")
+
+    def __write_stats(self):
+        # Called with the lock held.
+        stats_file = os.path.join(self.output_dir, "cpu.pstats")
+        self.stats.dump_stats(stats_file)
+        if stats_file not in self.files:
+            self.files.insert(0, stats_file)
+
+
+class Profiler:
+    """
+    Entry point of the on-demand profiling, shared by the whole process.
+
+    Methods:
+        - start: Starts a new profiling session, if none is running.
+        - stop: Ends the running session early and writes its results.
+        - section: Context manager wrapping the code of a profiling target.
+    """
+
+    def __init__(self):
+        self.session = None
+        self.lock = threading.Lock()
+
+    def start(self, session : ProfileSession) -> ProfileSession:
+        """
+        Raises:
+        - RuntimeError: If a profiling session is already running.
+        """
+        with self.lock:
+            if self.session is not None and self.session.sampler.is_alive():
+                raise RuntimeError("A profiling session is already running")
+            self.session = session
+            session.start()
+            return session
+
+    def stop(self) -> ProfileSession:
+        """
+        Returns:
+        - ProfileSession: The stopped session, or None if no session was started.
+        """
+        session = self.session
+        if session is not None:
+            session.stop()
+            session.sampler.join()
+        return session
+
+    @contextmanager
+    def section(self, target : str):
+        """
+        Profiles the wrapped block when a session is running for the target. Costs a single attribute
+        check when no session is running.
+
+        Parameters:
+        - target (str): The name of the profiling target, among "predict", "update" and "train".
+        """
+        session = self.session
+        if session is None or session.stopped.is_set() or not session.enter(target):
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:      # another profiler is already active in this thread
+            session.leave(None)
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            session.leave(profile)
+
+
+profiler = Profiler()
+
+def profiled(target : str):
+    """
+    Decorator profiling every call of the decorated function or coroutine as the given target.
+
+    Parameters:
+    - target (str): The name of the profiling target, among "predict", "update" and "train".
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with profiler.section(target):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler.section(target):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,10 @@
+import asyncio
+import bisect
+import importlib.util
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from typing import Iterator, Tuple
@@ -0,0 +1,42 @@
+"""
+Replays prediction requests from a JSONL file against the Jotun predict API and reports
+latency and error statistics.
+
+Usage:
+    python -m replay requests.jsonl --model mem_manager --rps 200 --arrival poisson
+    python -m replay requests.jsonl --url http://jotun:8000 --concurrency 32 --json report.json
+"""
+import argparse
+from replay import *
+from replay.replay import run
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m replay", description="Replay prediction requests against the Jotun predict API.")
+    parser.add_argument("path", help="JSONL file with one request per line")
+    parser.add_argument("--model", help="model used for the lines that do not set model_name")
+    parser.add_argument("--url", help="base URL of a running service, the in-process app is used when omitted")
+    parser.add_argument("--rps", type=float, default=0, help="target requests per second, 0 sends as fast as the concurrency allows")
+    parser.add_argument("--arrival", choices=["uniform", "poisson"], default="uniform", help="inter-arrival distribution when --rps is set")
+    parser.add_argument("--concurrency", type=int, default=64, help="maximum number of requests in flight")
+    parser.add_argument("--limit", type=int, help="maximum number of requests to send")
+    parser.add_argument("--timeout", type=float, default=30, help="request timeout in seconds")
+    parser.add_argument("--models-dir", default="./models", help="model artifacts used by the in-process app")
+    parser.add_argument("--json", dest="json_path", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(args.path, args.model, args.url, args.rps, args.arrival, args.concurrency,
+                            args.limit, args.timeout, args.models_dir))
+    summary = stats.summary()
+
+    from tabulate import tabulate
+    print(tabulate([{k: v for k, v in summary.items() if k not in ("outcomes", "latency_ms", "histogram")}], headers="keys", tablefmt="grid"))
+    print(tabulate([summary["latency_ms"]], headers="keys", tablefmt="grid"))
+    print(tabulate([summary["outcomes"]], headers="keys", tablefmt="grid"))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+from replay import *
+
+def iter_records(path : str, default_model : str = None, limit : int = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Streams the prediction requests of a JSONL file, one line at a time, so files of any size can be replayed.
+
+    Each line is either a record `{"model_name": "mem_manager", "request": {...}}` or, when a default
+    model is given, the bare request body sent to that model. Blank and malformed lines are skipped.
+
+    Parameters:
+    - path (str): The path to the JSONL file.
+    - default_model (str): The model used for the lines that do not name one.
+    - limit (int): The maximum number of records to yield. All the records are yielded when omitted.
+
+    Returns:
+    - generator: A generator yielding (model_name, request_body) tuples.
+    """
+    count = 0
+    with open(path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if limit is not None and count >= limit:
+                return
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping malformed line {line_number} :: {e}")
+                continue
+            if isinstance(record, dict) and "request" in record:
+                model_name, body = record.get("model_name", default_model), record["request"]
+            else:
+                model_name, body = default_model, record
+            if model_name is None:
+                print(f"Skipping line {line_number} :: no model_name in the record and no default model given")
+                continue
+            count += 1
+            yield model_name, body
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies with logarithmic buckets, from 0.1 ms to about 2 minutes.
+
+    Only the bucket counts are kept in memory, so replays of any length use a constant amount of memory.
+    Percentiles are reported as the upper bound of the bucket they fall into, which is accurate to 10%,
+    capped by the highest recorded latency.
+    """
+
+    BOUNDS_MS = [ 0.1 * 1.1 ** i for i in range(150) ]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms : float):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, latency_ms)] += 1
+        self.total += 1
+        self.sum_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, percent : float) -> float:
+        """
+        Parameters:
+        - percent (float): The percentile to compute, between 0 and 100.
+
+        Returns:
+        - float: The latency in milliseconds below which the given percentage of the requests completed.
+        """
+        if self.total == 0:
+            return 0.0
+        rank = percent / 100 * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.BOUNDS_MS[index], self.max_ms) if index < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def buckets(self) -> list:
+        """
+        Returns:
+        - list: The non empty buckets as dictionaries with their upper bound in milliseconds and their count.
+        """
+        return [ {"le_ms": round(self.BOUNDS_MS[index], 3) if index < len(self.BOUNDS_MS) else "inf", "count": count}
+                 for index, count in enumerate(self.counts) if count ]
+
+
+class ReplayStats:
+    """
+    Collects the outcome of every replayed request.
+
+    Outcomes are "success", "failure" (the API rejected the inputs), "http_<status>" for error responses
+    and the exception name for requests that did not complete.
+    """
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.outcomes = Counter()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, outcome : str, latency_ms : float):
+        self.outcomes[outcome] += 1
+        self.latency.record(latency_ms)
+
+    def summary(self) -> dict:
+        """
+        Returns:
+        - dict: The request count, achieved throughput, error rate and latency percentiles of the replay.
+        """
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        total = sum(self.outcomes.values())
+        errors = total - self.outcomes["success"] - self.outcomes["failure"]
+        return {
+            "requests": total,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "rejected_rate": round(self.outcomes["failure"] / total, 4) if total else 0.0,
+            "outcomes": dict(self.outcomes),
+            "latency_ms": {
+                "mean": round(self.latency.sum_ms / self.latency.total, 3) if self.latency.total else 0.0,
+                "p50": round(self.latency.percentile(50), 3),
+                "p90": round(self.latency.percentile(90), 3),
+                "p99": round(self.latency.percentile(99), 3),
+                "p999": round(self.latency.percentile(99.9), 3),
+                "max": round(self.latency.max_ms, 3),
+            },
+            "histogram": self.latency.buckets(),
+        }
+
+
+def load_app(models_dir : str = "./models"):
+    """
+    Loads the Jotun FastAPI application in process, with the models of `models_dir` in memory.
+
+    The lifespan of the application is not run, so no dataset update check, scheduler or database is
+    involved: only the serving path is exercised.
+
+    Parameters:
+    - models_dir (str): The directory containing the model artifacts.
+
+    Returns:
+    - FastAPI: The application, ready to be served through an ASGI transport.
+    """
+    from customizer.registry import reload_registry
+    from loaders.models import get_models
+    from loaders.partitions import PartitionCache
+    from shadow.shadow import ShadowEvaluator
+    from utils.settings import PARTITION_CACHE_SIZE, SHADOW_WINDOW_MINUTES, SHADOW_SAMPLE_RATE, SHADOW_QUEUE_SIZE, TRACKED_PREDICTIONS
+
+    app_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jotun-k8.py")
+    spec = importlib.util.spec_from_file_location("jotun_k8", app_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    app = module.app
+    app.state.models = get_models(models_dir, reload_registry(models_dir).names)
+    app.state.partitions = PartitionCache(models_dir, PARTITION_CACHE_SIZE)
+    app.state.update_lock = threading.Lock()
+    app.state.shadows = ShadowEvaluator(models_dir, SHADOW_WINDOW_MINUTES, SHADOW_SAMPLE_RATE, SHADOW_QUEUE_SIZE, TRACKED_PREDICTIONS)
+    app.state.shadows.refresh(app.state.models)
+    app.state.shadows.start()
+    return app
+
+
+async def send(client, model_name : str, body : dict, scheduled : float, stats : ReplayStats, semaphore : asyncio.Semaphore):
+    """
+    Sends one prediction request and records its outcome.
+
+    The latency is measured from the time the request was scheduled to be sent, not from the time it
+    was actually sent, so a saturated service shows up as growing latencies instead of a lower send rate.
+    """
+    try:
+        response = await client.post(f"/models/predict/{model_name}", json=body)
+        if response.status_code != 200:
+            outcome = f"http_{response.status_code}"
+        else:
+            outcome = response.json().get("status", "success")
+    except Exception as e:
+        outcome = type(e).__name__
+    finally:
+        semaphore.release()
+    stats.record(outcome, (time.perf_counter() - scheduled) * 1000)
+
+
+async def replay(client, records : Iterator[Tuple[str, dict]], rps : float = 0, arrival : str = "uniform", concurrency : int = 64) -> ReplayStats:
+    """
+    Replays the records against the predict API.
+
+    Parameters:
+    - client (httpx.AsyncClient): The client sending the requests, bound to a URL or to an ASGI app.
+    - records (Iterator): The (model_name, request_body) tuples to send, see `iter_records`.
+    - rps (float): The target request rate. When 0, requests are sent as fast as the concurrency allows.
+    - arrival (str): "uniform" sends the requests at a fixed interval, "poisson" draws exponentially
+      distributed intervals (open-loop arrivals) with the same average rate.
+    - concurrency (int): The maximum number of requests in flight.
+
+    Returns:
+    - ReplayStats: The outcome and latency statistics of the replay.
+    """
+    stats = ReplayStats()
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight = set()
+    next_send = time.perf_counter()
+
+    for model_name, body in records:
+        if rps > 0:
+            next_send += random.expovariate(rps) if arrival == "poisson" else 1 / rps
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await semaphore.acquire()
+        scheduled = next_send if rps > 0 else time.perf_counter()
+        task = asyncio.create_task(send(client, model_name, body, scheduled, stats, semaphore))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    stats.finished = time.perf_counter()
+    return stats
+
+
+async def run(path : str, model : str = None, url : str = None, rps : float = 0, arrival : str = "uniform",
+              concurrency : int = 64, limit : int = None, timeout : float = 30, models_dir : str = "./models") -> ReplayStats:
+    """
+    Replays a JSONL file against a running Jotun service, or against the in-process application when
+    no URL is given.
+
+    Returns:
+    - ReplayStats: The outcome and latency statistics of the replay.
+    """
+    import httpx
+
+    if url:
+        transport, base_url = None, url
+    else:
+        transport, base_url = httpx.ASGITransport(app=load_app(models_dir)), "http://jotun"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=timeout, limits=limits) as client:
+        return await replay(client, iter_records(path, model, limit), rps, arrival, concurrency)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+from profiling.profiler import TARGETS, ProfileSession, profiler
+from utils.settings import PROFILE_DIR
+
+admin_router = APIRouter()
+
+class ProfileRequest(BaseModel):
+    targets: List[str] = list(TARGETS)
+    duration_seconds: float = 60
+    max_requests: Optional[int] = None
+    sample_interval_ms: float = 5
+    trace_allocations: bool = True
+
+@admin_router.post("/profile")
+async def start_profile(request: ProfileRequest):
+    if request.duration_seconds <= 0 or request.duration_seconds > 3600:
+        raise HTTPException(400, "duration_seconds must be between 0 and 3600")
+    if request.sample_interval_ms <= 0:
+        raise HTTPException(400, "sample_interval_ms must be greater than 0")
+    if request.max_requests is not None and request.max_requests < 0:
+        raise HTTPException(400, "max_requests must not be negative")
+    try:
+        session = ProfileSession(request.targets, request.duration_seconds, request.max_requests, PROFILE_DIR,
+                                 request.sample_interval_ms, request.trace_allocations)
+        profiler.start(session)
+    except ValueError as e:
+        raise HTTPException(400, f"{e}")
+    except RuntimeError as e:
+        raise HTTPException(409, f"{e}")
+    return {"status": "success", "message": "Profiling started", "session": session.summary()}
+
+@admin_router.get("/profile")
+async def profile_status():
+    session = profiler.session
+    return {"running": session is not None and session.sampler.is_alive(), "session": session.summary() if session else None}
+
+@admin_router.delete("/profile")
+def stop_profile():
+    # Plain function, run in the threadpool: stopping waits for the results to be written, which
+    # includes the tracemalloc snapshot, and must not block the predictions on the event loop.
+    session = profiler.stop()
+    if session is None:
+        raise HTTPException(404, "No profiling session was started")
+    return {"status": "success", "message": "Profiling stopped", "session": session.summary()}
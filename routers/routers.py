@@ -1,26 +1,80 @@
+import os
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Dict
 from fastapi import Request
 from customizer.customize import Customizer
+from loaders.models import get_model
+from loaders.partitions import PartitionCache
+from profiling.profiler import profiled
+from shadow.shadow import ShadowEvaluator, rollback_model
+from utils.partitions import partition_key
+from utils.settings import PARTITION_BY
 
 router = APIRouter()
 
 def get_models(request: Request) -> Dict[str, object]:
     return request.app.state.models
 
+def get_partitions(request: Request) -> PartitionCache:
+    return request.app.state.partitions
+
+def get_shadows(request: Request) -> ShadowEvaluator:
+    return request.app.state.shadows
+
+class ActualValues(BaseModel):
+    prediction_id: str
+    actual: Dict[str, float]
+
 @router.post("/predict/{model_name}")
-async def predict(model_name: str, request: Dict, models: Dict[str, object] = Depends(get_models)):
+@profiled("predict")
+async def predict(model_name: str, request: Dict, models: Dict[str, object] = Depends(get_models), partitions: PartitionCache = Depends(get_partitions),
+                  shadows: ShadowEvaluator = Depends(get_shadows)):
+    if model_name not in models:
+        raise HTTPException(404, f"Model {model_name} is not served by this worker")
     customize = Customizer()
     isValidationSuccess = customize.validate(model_name)
     if not isValidationSuccess:
         raise HTTPException(400, f"Validation failed for the current model {model_name}")
     model = models[model_name]
     request_dict = customize.get_model_instance(model_name, request)
+    partition_fields = customize.get_partition_fields(model_name, request_dict) if PARTITION_BY else None
+    if partition_fields:
+        model = partitions.get(model_name, partition_key(*partition_fields)) or model   # falls back to the global model
     input_validation_errors = customize.validate_features(model_name, model, request_dict)
     if input_validation_errors:
         return {"status": "failure", "message": "Validation failed for the inputs", "errors": input_validation_errors}
-    prediction = model.predict(customize.get_prediction_features(model_name, request_dict))
-    return {"status": "success", "message": "Predicted the result successfully", "result" : customize.get_processed_result(model_name, prediction)}
+    features = customize.get_prediction_features(model_name, request_dict)
+    result = customize.get_processed_result(model_name, model.predict(features))
+    prediction_id = shadows.track(model_name, features, result) if model is models[model_name] else None     # partition models are not versioned
+    return {"status": "success", "message": "Predicted the result successfully", "result" : result, "prediction_id": prediction_id}
+
+@router.post("/actuals/{model_name}")
+async def ingest_actuals(model_name: str, actuals: ActualValues, shadows: ShadowEvaluator = Depends(get_shadows)):
+    if not shadows.record_actual(model_name, actuals.prediction_id, actuals.actual):
+        raise HTTPException(404, f"Prediction {actuals.prediction_id} of the model {model_name} is unknown or too old")
+    return {"status": "success", "message": "Recorded the actual values successfully"}
+
+@router.get("/evaluation/{model_name}")
+async def evaluation(model_name: str, models: Dict[str, object] = Depends(get_models), shadows: ShadowEvaluator = Depends(get_shadows)):
+    if model_name not in models:
+        raise HTTPException(404, f"Model {model_name} is not served by this worker")
+    return shadows.summary(model_name)
+
+@router.post("/rollback/{model_name}")
+def rollback(model_name: str, request: Request, shadows: ShadowEvaluator = Depends(get_shadows)):
+    # Plain function, run in the threadpool: it swaps files and loads a model. The update lock keeps a
+    # concurrent model reload from being overwritten by the stale dict read here.
+    with request.app.state.update_lock:
+        models = request.app.state.models
+        if model_name not in models:
+            raise HTTPException(404, f"Model {model_name} is not served by this worker")
+        try:
+            rollback_model(shadows.models_dir, model_name)
+        except FileNotFoundError as e:
+            raise HTTPException(400, f"{e}")
+        request.app.state.models = {**models, model_name: get_model(os.path.join(shadows.models_dir, f"{model_name}.pkl"))}
+        shadows.refresh([model_name])      # the rolled back version becomes the shadow
+    return {"status": "success", "message": f"Rolled back the model {model_name}", "current_version": shadows.versions.get(model_name)}
 
 
@@ -0,0 +1,12 @@
+import numbers
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+import filelock
+from customizer.customize import Customizer
+from loaders.models import get_model, get_previous_model_file
@@ -0,0 +1,271 @@
+from shadow import *
+
+def get_model_version(model_file) -> str:
+    """
+    Returns the version of a model artifact, which is the time it was trained at.
+
+    The modification time is preserved when an artifact is moved to or from the `previous` directory,
+    so a version keeps its name across retrains and rollbacks.
+
+    Parameters:
+    - model_file (str): The path to the model artifact.
+
+    Returns:
+    - str: The version of the artifact, e.g. "20250408T101530".
+    """
+    return datetime.fromtimestamp(os.stat(model_file).st_mtime).strftime("%Y%m%dT%H%M%S")
+
+def abs_differences(result : dict, other : dict) -> dict:
+    """
+    Returns the absolute difference of every numeric value two processed results have in common.
+
+    Parameters:
+    - result (dict): A processed prediction, e.g. {"cpu": 0.5, "memory": 1.2}.
+    - other (dict): Another processed prediction or the actual values.
+
+    Returns:
+    - dict: The absolute differences keyed by output, e.g. {"cpu": 0.1, "memory": 0.3}.
+    """
+    return { key: abs(float(result[key]) - float(other[key])) for key in result
+             if key in other and isinstance(other[key], numbers.Real) and isinstance(result[key], numbers.Real) }
+
+def rollback_model(models_dir : str, model_name : str):
+    """
+    Swaps a model artifact with its previous version, under the same file lock as the trainer and the loader.
+
+    Rolling back twice restores the version that was rolled back. The dataset hash is left untouched,
+    so the model is not retrained until its dataset changes again.
+
+    Parameters:
+    - models_dir (str): The directory containing the model artifacts.
+    - model_name (str): The name of the model.
+
+    Raises:
+    - FileNotFoundError: If there is no previous version of the model.
+    """
+    model_file = os.path.join(models_dir, f"{model_name}.pkl")
+    previous_file = get_previous_model_file(models_dir, model_name)
+    swap_file = os.path.join(models_dir, f"{model_name}_rollback.pkl")
+    with filelock.FileLock(f"{model_file}.lock"):
+        if not previous_file.exists():
+            raise FileNotFoundError(f"No previous version found for the model {model_name}")
+        os.replace(model_file, swap_file)
+        os.replace(previous_file, model_file)
+        os.replace(swap_file, previous_file)
+    print(f"Model '{model_name}' rolled back to its previous version.")
+
+
+class VersionStats:
+    """
+    Online metrics of one model version.
+
+    Attributes:
+    - predictions (int): The number of predictions served by the version.
+    - shadow_samples (int): The number of predictions replayed on the version while it was the shadow.
+    - divergence (dict): Per output (e.g. "cpu", "memory"), the number of shadow predictions and the sum of
+      their absolute differences with the serving version.
+    - actuals (int): The number of predictions of the version matched with an actual value.
+    - errors (dict): Per output, the number of actual values and the sums of the absolute and squared errors.
+      Outputs have different units, so neither their divergences nor their errors are ever mixed.
+    """
+
+    def __init__(self):
+        self.predictions = 0
+        self.shadow_samples = 0
+        self.divergence = defaultdict(lambda: {"count": 0, "abs_difference_sum": 0.0})
+        self.actuals = 0
+        self.errors = defaultdict(lambda: {"count": 0, "abs_error_sum": 0.0, "sq_error_sum": 0.0})
+
+    def record_divergence(self, differences : dict):
+        self.shadow_samples += 1
+        for key, difference in differences.items():
+            divergence = self.divergence[key]
+            divergence["count"] += 1
+            divergence["abs_difference_sum"] += difference
+
+    def record_errors(self, differences : dict):
+        self.actuals += 1
+        for key, difference in differences.items():
+            error = self.errors[key]
+            error["count"] += 1
+            error["abs_error_sum"] += difference
+            error["sq_error_sum"] += difference ** 2
+
+    def as_dict(self) -> dict:
+        return {
+            "predictions": self.predictions,
+            "shadow_samples": self.shadow_samples,
+            "divergence": { key: { "shadow_samples": divergence["count"],
+                                   "mean_abs_difference": divergence["abs_difference_sum"] / divergence["count"] }
+                            for key, divergence in self.divergence.items() },
+            "actuals": self.actuals,
+            "errors": { key: { "actuals": error["count"],
+                               "mae": error["abs_error_sum"] / error["count"],
+                               "rmse": (error["sq_error_sum"] / error["count"]) ** 0.5 }
+                        for key, error in self.errors.items() },
+        }
+
+
+class ShadowEvaluator:
+    """
+    Compares a retrained model with its previous version without slowing down the predictions.
+
+    Description:
+    When a model artifact changes, the previous version (kept by the trainer in `models/previous`) is loaded
+    as a shadow for a limited window. A sampled fraction of the predictions is queued and replayed on the shadow
+    by a background thread, which records how far the two versions diverge. The recent predictions of both
+    versions are also kept, so the actual values ingested later give the error of each version.
+
+    Methods:
+        - start: Starts the background thread running the shadow predictions.
+        - refresh: Records the versions of the served models and activates the shadows of the changed ones.
+        - track: Records a prediction and samples it for the shadow. Called on the request path.
+        - record_actual: Records the actual values of a past prediction.
+        - summary: Returns the metrics of every version of a model.
+    """
+
+    def __init__(self, models_dir : str, window_minutes : float, sample_rate : float, queue_size : int, max_tracked : int):
+        """
+        Parameters:
+        - models_dir (str): The directory containing the model artifacts.
+        - window_minutes (float): How long the previous version stays loaded as a shadow. 0 disables the shadows.
+        - sample_rate (float): The fraction of the predictions replayed on the shadow.
+        - queue_size (int): The maximum number of pending shadow predictions. Samples are dropped when it is full.
+        - max_tracked (int): The number of recent predictions kept to match the actual values.
+        """
+        self.models_dir = models_dir
+        self.window_seconds = window_minutes * 60
+        self.sample_rate = sample_rate
+        self.max_tracked = max_tracked
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.shadows = {}
+        self.predictions = OrderedDict()
+        self.stats = defaultdict(VersionStats)
+        self.dropped = 0
+        self.worker = None
+
+    def start(self):
+        if self.worker is None:
+            self.worker = threading.Thread(target=self.__run, name="jotun-shadow", daemon=True)
+            self.worker.start()
+
+    def refresh(self, model_names):
+        """
+        Records the versions of the served models, and loads the previous version of every model whose
+        artifact changed since the last refresh as its shadow.
+
+        Parameters:
+        - model_names (iterable): The names of the served models.
+        """
+        with self.lock:
+            self.__expire_shadows()
+        for model_name in model_names:
+            model_file = os.path.join(self.models_dir, f"{model_name}.pkl")
+            if not os.path.exists(model_file):
+                continue
+            version = get_model_version(model_file)
+            known_version = self.versions.get(model_name)
+            self.versions[model_name] = version
+            if known_version is None or known_version == version or self.window_seconds <= 0:
+                continue
+            previous_file = get_previous_model_file(self.models_dir, model_name)
+            if not previous_file.exists():
+                continue
+            shadow = {"model": get_model(previous_file), "version": get_model_version(previous_file), "expires": time.time() + self.window_seconds}
+            with self.lock:
+                self.shadows[model_name] = shadow
+            print(f"Model '{model_name}' version {shadow['version']} is running as a shadow of version {version}.")
+
+    def track(self, model_name : str, features, result : dict) -> str:
+        """
+        Records a prediction served by the current version of a model, and queues it for the shadow when sampled.
+
+        Parameters:
+        - model_name (str): The name of the model.
+        - features (Any): The features the prediction was made with.
+        - result (dict): The processed prediction.
+
+        Returns:
+        - str: The identifier of the prediction, used to ingest its actual values later.
+        """
+        prediction_id = uuid.uuid4().hex
+        version = self.versions.get(model_name)
+        with self.lock:
+            self.predictions[prediction_id] = {"model_name": model_name, "results": {version: result}}
+            while len(self.predictions) > self.max_tracked:
+                self.predictions.popitem(last=False)
+            self.stats[(model_name, version)].predictions += 1
+            self.__expire_shadows()
+            shadow = self.shadows.get(model_name)
+        if shadow and random.random() < self.sample_rate:
+            try:
+                self.queue.put_nowait((prediction_id, model_name, features, result, shadow))
+            except queue.Full:
+                self.dropped += 1
+        return prediction_id
+
+    def record_actual(self, model_name : str, prediction_id : str, actual : dict) -> bool:
+        """
+        Records the actual values of a past prediction and updates the error of every version that predicted it.
+
+        Parameters:
+        - model_name (str): The name of the model the prediction was made with.
+        - prediction_id (str): The identifier returned with the prediction.
+        - actual (dict): The actual values, with the same keys as the processed prediction.
+
+        Returns:
+        - bool: True if the prediction was found, False if it is unknown, too old, or made by another model.
+        """
+        with self.lock:
+            prediction = self.predictions.get(prediction_id)
+            if prediction is None or prediction["model_name"] != model_name:
+                return False
+            del self.predictions[prediction_id]
+            for version, result in prediction["results"].items():
+                differences = abs_differences(result, actual)
+                if differences:
+                    self.stats[(model_name, version)].record_errors(differences)
+        return True
+
+    def summary(self, model_name : str) -> dict:
+        """
+        Returns:
+        - dict: The current version of the model, its active shadow, and the metrics of each of its versions.
+        """
+        with self.lock:
+            self.__expire_shadows()
+            shadow = self.shadows.get(model_name)
+            return {
+                "current_version": self.versions.get(model_name),
+                "shadow": { "version": shadow["version"], "expires_in_s": max(0, round(shadow["expires"] - time.time())) } if shadow else None,
+                "versions": { version: stats.as_dict() for (name, version), stats in self.stats.items() if name == model_name },
+                "dropped_shadow_samples": self.dropped,
+            }
+
+    def __expire_shadows(self):
+        # Called with the lock held. Drops the shadows whose window is over, so their model is released
+        # even when the model gets no traffic.
+        now = time.time()
+        for model_name in [ name for name, shadow in self.shadows.items() if shadow["expires"] < now ]:
+            del self.shadows[model_name]
+            print(f"Shadow of the model '{model_name}' expired.")
+
+    def __run(self):
+        while True:
+            try:
+                prediction_id, model_name, features, result, shadow = self.queue.get(timeout=60)
+            except queue.Empty:
+                with self.lock:
+                    self.__expire_shadows()
+                continue
+            try:
+                shadow_result = Customizer().get_processed_result(model_name, shadow["model"].predict(features))
+            except Exception as e:
+                print(f"Shadow prediction failed for the model {model_name} version {shadow['version']} :: {e}")
+                continue
+            with self.lock:
+                self.stats[(model_name, shadow["version"])].record_divergence(abs_differences(result, shadow_result))
+                if prediction_id in self.predictions:
+                    self.predictions[prediction_id]["results"][shadow["version"]] = shadow_result
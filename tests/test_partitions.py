@@ -0,0 +1,65 @@
+import pytest
+from utils.partitions import is_valid_partition, partition_key
+
+
+def test_partition_key_by_namespace():
+    assert partition_key("team-a", "web", mode="namespace") == "team-a"
+
+
+def test_partition_key_by_hash_is_stable_and_bounded():
+    key = partition_key("team-a", "web", mode="hash", buckets=8)
+    assert key == partition_key("team-a", "web", mode="hash", buckets=8)
+    assert key.startswith("bucket-")
+    assert 0 <= int(key[len("bucket-"):]) < 8
+
+
+def test_partition_key_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        partition_key("team-a", "web", mode="deployment")
+
+
+@pytest.mark.parametrize("partition", ["default", "team-a", "kube.system", "bucket-003"])
+def test_valid_partitions(partition):
+    assert is_valid_partition(partition)
+
+
+@pytest.mark.parametrize("partition", ["", ".", "..", "../../tmp/x", "a/b", "a\\b", "/etc", "-x", "a..b"])
+def test_invalid_partitions(partition):
+    assert not is_valid_partition(partition)
+
+
+class TestPartitionCache:
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path):
+        joblib = pytest.importorskip("joblib")
+        pytest.importorskip("filelock")
+        for partition in ("a", "b", "c"):
+            (tmp_path / "m").mkdir(exist_ok=True)
+            joblib.dump({"partition": partition}, tmp_path / "m" / f"{partition}.pkl")
+        joblib.dump({"partition": "outside"}, tmp_path / "outside.pkl")
+        return tmp_path
+
+    def test_evicts_least_recently_used(self, cache_dir):
+        from loaders.partitions import PartitionCache
+        cache = PartitionCache(cache_dir, capacity=2)
+        assert cache.get("m", "a") == {"partition": "a"}
+        cache.get("m", "b")
+        cache.get("m", "a")
+        cache.get("m", "c")
+        assert list(cache.models) == [("m", "a"), ("m", "c")]
+
+    def test_missing_partition_falls_back(self, cache_dir):
+        from loaders.partitions import PartitionCache
+        assert PartitionCache(cache_dir, capacity=2).get("m", "unknown") is None
+
+    def test_rejects_path_traversal(self, cache_dir):
+        from loaders.partitions import PartitionCache
+        assert PartitionCache(cache_dir, capacity=2).get("m", "../outside") is None
+
+    def test_clear(self, cache_dir):
+        from loaders.partitions import PartitionCache
+        cache = PartitionCache(cache_dir, capacity=2)
+        cache.get("m", "a")
+        cache.clear()
+        assert not cache.models
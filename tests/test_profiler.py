@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import tracemalloc
+import pytest
+from profiling.profiler import ProfileSession, Profiler, collapse_stack
+
+
+@pytest.fixture
+def profiler():
+    profiler = Profiler()
+    yield profiler
+    profiler.stop()
+
+
+def busy():
+    return sum(i * i for i in range(20000))
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"sample_interval_ms": 0},
+    {"sample_interval_ms": -1},
+    {"max_requests": -1},
+    {"duration_seconds": 0},
+])
+def test_invalid_sessions_are_rejected(tmp_path, kwargs):
+    options = {"duration_seconds": 1, "max_requests": None, "sample_interval_ms": 5}
+    options.update(kwargs)
+    with pytest.raises(ValueError):
+        ProfileSession(["predict"], options["duration_seconds"], options["max_requests"], str(tmp_path),
+                       sample_interval_ms=options["sample_interval_ms"])
+
+
+def test_unknown_target_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ProfileSession(["nope"], 1, None, str(tmp_path))
+
+
+def test_request_budget_ends_the_session(profiler, tmp_path):
+    session = profiler.start(ProfileSession(["predict"], 10, 2, str(tmp_path), sample_interval_ms=1, trace_allocations=False))
+    for _ in range(3):
+        with profiler.section("predict"):
+            busy()
+    session.sampler.join(timeout=5)
+    assert not session.sampler.is_alive()
+    assert session.sections["predict"] == 2
+    assert os.path.exists(os.path.join(session.output_dir, "cpu.pstats"))
+    assert os.path.exists(os.path.join(session.output_dir, "cpu.collapsed"))
+
+
+def test_sections_after_the_deadline_are_not_profiled(profiler, tmp_path):
+    session = profiler.start(ProfileSession(["update"], 0.05, None, str(tmp_path), trace_allocations=False))
+    time.sleep(0.1)
+    with profiler.section("update"):
+        busy()
+    assert session.sections["update"] == 0
+
+
+def test_nested_sections_are_profiled_once(profiler, tmp_path):
+    session = profiler.start(ProfileSession(["update", "train"], 10, None, str(tmp_path), trace_allocations=False))
+    with profiler.section("update"):
+        with profiler.section("train"):
+            busy()
+    assert dict(session.sections) == {"update": 1}
+
+
+def test_only_one_session_at_a_time(profiler, tmp_path):
+    profiler.start(ProfileSession(["predict"], 10, None, str(tmp_path), trace_allocations=False))
+    with pytest.raises(RuntimeError):
+        profiler.start(ProfileSession(["predict"], 10, None, str(tmp_path), trace_allocations=False))
+
+
+def test_allocation_tracing_is_stopped_and_dumped(profiler, tmp_path):
+    assert not tracemalloc.is_tracing()
+    session = profiler.start(ProfileSession(["train"], 10, None, str(tmp_path)))
+    assert tracemalloc.is_tracing()
+    profiler.stop()
+    assert not tracemalloc.is_tracing()
+    assert os.path.exists(os.path.join(session.output_dir, "alloc.tracemalloc"))
+    assert os.path.exists(os.path.join(session.output_dir, "alloc_top.txt"))
+
+
+def test_collapse_stack_starts_at_the_root():
+    stack = collapse_stack(sys._getframe(), "predict")
+    assert stack.startswith("predict;")
+    assert stack.endswith("test_profiler.py:test_collapse_stack_starts_at_the_root")
+
+
+def test_section_outliving_the_session_is_written(profiler, tmp_path):
+    session = profiler.start(ProfileSession(["train"], 0.2, None, str(tmp_path), sample_interval_ms=1, trace_allocations=False))
+    with profiler.section("train"):
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            busy()
+        assert not session.sampler.is_alive()
+    stats_file = os.path.join(session.output_dir, "cpu.pstats")
+    assert os.path.exists(stats_file)
+    assert session.summary()["files"][0] == stats_file
+    assert "cpu.collapsed" in [os.path.basename(file) for file in session.summary()["files"]]
@@ -0,0 +1,151 @@
+import pickle
+import sys
+import pytest
+
+pytest.importorskip("pydantic")
+
+import customizer.registry as registry_module
+from customizer.jotun_model import ModelInterface
+from customizer.registry import BUILTIN_MODELS, ModelRegistry, shard_of
+
+PLUGIN = '''
+from customizer.jotun_model import ModelInterface
+
+class Scaler:
+    pass
+
+class TeamImpl(ModelInterface):
+    pass
+'''
+
+
+class FakeEntryPoint:
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def load(self):
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+class EntryPointImpl(ModelInterface):
+    pass
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    return models_dir
+
+
+@pytest.fixture
+def no_entry_points(monkeypatch):
+    monkeypatch.setattr(registry_module, "entry_points", lambda group: [])
+
+
+def test_shard_of_is_stable_and_in_range():
+    assert shard_of("mem_manager", 4) == shard_of("mem_manager", 4)
+    assert all(0 <= shard_of(f"model_{i}", 3) < 3 for i in range(50))
+    assert {shard_of(f"model_{i}", 3) for i in range(50)} == {0, 1, 2}
+
+
+def test_invalid_shard_is_rejected(models_dir):
+    with pytest.raises(ValueError):
+        ModelRegistry(str(models_dir), shard_index=2, shard_count=2)
+
+
+def test_only_models_with_an_artifact_are_served(models_dir, no_entry_points):
+    (models_dir / "mem_manager.pkl").touch()
+    registry = ModelRegistry(str(models_dir))
+    assert set(registry.available) == set(BUILTIN_MODELS)
+    assert registry.names == {"mem_manager"}
+
+
+def test_models_are_split_across_shards(models_dir, no_entry_points):
+    for name in BUILTIN_MODELS:
+        (models_dir / f"{name}.pkl").touch()
+    shards = [ ModelRegistry(str(models_dir), shard_index=index, shard_count=2).names for index in range(2) ]
+    assert shards[0] | shards[1] == set(BUILTIN_MODELS)
+    assert not shards[0] & shards[1]
+    for index, names in enumerate(shards):
+        assert all(shard_of(name, 2) == index for name in names)
+
+
+def test_entry_points_must_be_model_implementations(models_dir, monkeypatch):
+    monkeypatch.setattr(registry_module, "entry_points", lambda group: [
+        FakeEntryPoint("good", EntryPointImpl),
+        FakeEntryPoint("not_a_class", lambda: None),
+        FakeEntryPoint("not_a_model", dict),
+        FakeEntryPoint("broken", ImportError("missing dependency")),
+    ])
+    registry = ModelRegistry(str(models_dir))
+    assert registry.available["good"] is EntryPointImpl
+    assert not {"not_a_class", "not_a_model", "broken"} & set(registry.available)
+
+
+def test_plugin_files_define_exactly_one_implementation(models_dir, tmp_path, no_entry_points):
+    plugin_dir = tmp_path / "plugins"
+    plugin_dir.mkdir()
+    (plugin_dir / "team.py").write_text(PLUGIN)
+    (plugin_dir / "empty.py").write_text("VALUE = 1\n")
+    (plugin_dir / "twice.py").write_text(PLUGIN + "\nclass OtherImpl(ModelInterface):\n    pass\n")
+    (plugin_dir / "broken.py").write_text("raise ImportError('missing dependency')\n")
+    (models_dir / "team.pkl").touch()
+    registry = ModelRegistry(str(models_dir), str(plugin_dir))
+    assert registry.available["team"].__name__ == "TeamImpl"
+    assert not {"empty", "twice", "broken"} & set(registry.available)
+    assert "team" in registry.names
+    assert "jotun_plugins.broken" not in sys.modules
+
+
+def test_plugin_classes_can_be_pickled(models_dir, tmp_path, no_entry_points):
+    plugin_dir = tmp_path / "plugins"
+    plugin_dir.mkdir()
+    (plugin_dir / "team.py").write_text(PLUGIN)
+    ModelRegistry(str(models_dir), str(plugin_dir))
+    scaler = sys.modules["jotun_plugins.team"].Scaler()
+    assert type(pickle.loads(pickle.dumps(scaler))) is type(scaler)
+
+
+def test_updater_skips_datasets_of_unserved_models(tmp_path, monkeypatch):
+    pytest.importorskip("filelock")
+    pytest.importorskip("tabulate")
+    import updater.updater as updater_module
+
+    class FakeCustomizer:
+        trained = []
+
+        def get_partition_columns(self, model_name):
+            return None
+
+        def validate(self, model_name):
+            return True
+
+        def train_and_save(self, model_name, model, dataset, save_path, export_name=None):
+            self.trained.append(model_name)
+
+    class FakeDB:
+        hashes = {}
+
+        def __init__(self, path):
+            pass
+
+        def fetch_hashes(self):
+            return dict(self.hashes), None
+
+        def insert_hash(self, model_name, hash):
+            self.hashes[model_name] = {"dataset_hash": hash, "previous_dataset_hash": hash}
+
+    (tmp_path / "datasets").mkdir()
+    (tmp_path / "datasets" / "served.csv").write_text("a\n1\n")
+    (tmp_path / "datasets" / "other.csv").write_text("a\n1\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(updater_module, "Customizer", FakeCustomizer)
+    monkeypatch.setattr(updater_module, "JotunDBUtils", FakeDB)
+    assert updater_module.JotunUpdater({"served": object()}).update()
+    assert FakeCustomizer.trained == ["served"]
+    assert set(FakeDB.hashes) == {"served"}
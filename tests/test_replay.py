@@ -0,0 +1,79 @@
+import asyncio
+import json
+from replay.replay import LatencyHistogram, iter_records, replay
+
+
+def test_histogram_percentiles_are_within_a_bucket():
+    histogram = LatencyHistogram()
+    for latency_ms in range(1, 101):
+        histogram.record(float(latency_ms))
+    assert histogram.total == 100
+    assert 50 <= histogram.percentile(50) <= 55
+    assert 99 <= histogram.percentile(99) <= 100
+    assert histogram.max_ms == 100
+    assert histogram.percentile(99) <= histogram.percentile(99.9) <= histogram.max_ms
+    assert sum(bucket["count"] for bucket in histogram.buckets()) == 100
+
+
+def test_histogram_overflow_bucket_reports_the_max():
+    histogram = LatencyHistogram()
+    histogram.record(10 ** 9)
+    assert histogram.percentile(99) == 10 ** 9
+    assert histogram.buckets() == [{"le_ms": "inf", "count": 1}]
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_iter_records_streams_and_skips_bad_lines(tmp_path):
+    path = tmp_path / "requests.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"model_name": "a", "request": {"x": 1}}),
+        "",
+        "not json",
+        json.dumps({"x": 2}),
+        json.dumps({"x": 3}),
+    ]))
+    assert list(iter_records(path, "b")) == [("a", {"x": 1}), ("b", {"x": 2}), ("b", {"x": 3})]
+    assert list(iter_records(path, "b", limit=2)) == [("a", {"x": 1}), ("b", {"x": 2})]
+    assert list(iter_records(path)) == [("a", {"x": 1})]
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def post(self, url, json):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if json["x"] == "error":
+            return FakeResponse(500, {})
+        if json["x"] == "timeout":
+            raise TimeoutError()
+        return FakeResponse(200, {"status": json["x"]})
+
+
+def test_replay_counts_outcomes_and_bounds_concurrency():
+    client = FakeClient()
+    records = [ ("m", {"x": outcome}) for outcome in ["success"] * 6 + ["failure", "error", "timeout"] ]
+    stats = asyncio.run(replay(client, iter(records), concurrency=2))
+    summary = stats.summary()
+    assert summary["requests"] == 9
+    assert summary["outcomes"] == {"success": 6, "failure": 1, "http_500": 1, "TimeoutError": 1}
+    assert summary["error_rate"] == round(2 / 9, 4)
+    assert client.max_in_flight <= 2
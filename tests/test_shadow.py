@@ -0,0 +1,75 @@
+import os
+import time
+import pytest
+
+pytest.importorskip("filelock")
+pytest.importorskip("joblib")
+pytest.importorskip("pydantic")
+
+from shadow.shadow import ShadowEvaluator, VersionStats, abs_differences, rollback_model
+
+
+def test_abs_differences_ignores_non_numeric_and_missing_outputs():
+    assert abs_differences({"cpu": 1.0, "memory": 2.0, "unit": "Gi"}, {"cpu": 1.5, "unit": "Gi"}) == {"cpu": 0.5}
+
+
+def test_divergence_is_reported_per_output():
+    stats = VersionStats()
+    stats.record_divergence(abs_differences({"cpu": 1.0, "memory": 10.0}, {"cpu": 1.5, "memory": 14.0}))
+    stats.record_divergence(abs_differences({"cpu": 1.0, "memory": 10.0}, {"cpu": 1.5, "memory": 10.0}))
+    summary = stats.as_dict()
+    assert summary["shadow_samples"] == 2
+    assert summary["divergence"] == {"cpu": {"shadow_samples": 2, "mean_abs_difference": 0.5},
+                                     "memory": {"shadow_samples": 2, "mean_abs_difference": 2.0}}
+
+
+@pytest.fixture
+def evaluator(tmp_path):
+    return ShadowEvaluator(str(tmp_path), window_minutes=1, sample_rate=0, queue_size=10, max_tracked=10)
+
+
+def test_errors_are_reported_per_output(evaluator):
+    for result, actual in [({"cpu": 1.0, "memory": 10.0}, {"cpu": 2.0, "memory": 10.0}),
+                           ({"cpu": 1.0, "memory": 10.0}, {"cpu": 1.0, "memory": 14.0})]:
+        prediction_id = evaluator.track("m", [[0]], result)
+        assert evaluator.record_actual("m", prediction_id, actual)
+    errors = evaluator.summary("m")["versions"][None]["errors"]
+    assert errors["cpu"] == {"actuals": 2, "mae": 0.5, "rmse": pytest.approx(0.5 ** 0.5)}
+    assert errors["memory"] == {"actuals": 2, "mae": 2.0, "rmse": pytest.approx(8 ** 0.5)}
+
+
+def test_actuals_of_another_model_are_rejected(evaluator):
+    prediction_id = evaluator.track("m", [[0]], {"cpu": 1.0})
+    assert not evaluator.record_actual("other", prediction_id, {"cpu": 1.0})
+    assert evaluator.record_actual("m", prediction_id, {"cpu": 1.0})
+    assert not evaluator.record_actual("m", prediction_id, {"cpu": 1.0})
+
+
+def test_tracked_predictions_are_bounded(evaluator):
+    prediction_ids = [ evaluator.track("m", [[0]], {"cpu": 1.0}) for _ in range(11) ]
+    assert len(evaluator.predictions) == 10
+    assert not evaluator.record_actual("m", prediction_ids[0], {"cpu": 1.0})
+
+
+def test_expired_shadow_is_released_without_traffic(evaluator):
+    evaluator.shadows["m"] = {"model": object(), "version": "v1", "expires": time.time() - 1}
+    assert evaluator.summary("m")["shadow"] is None
+    assert "m" not in evaluator.shadows
+
+
+def test_rollback_swaps_with_previous_version(tmp_path):
+    (tmp_path / "previous").mkdir()
+    (tmp_path / "m.pkl").write_text("new")
+    (tmp_path / "previous" / "m.pkl").write_text("old")
+    rollback_model(str(tmp_path), "m")
+    assert (tmp_path / "m.pkl").read_text() == "old"
+    assert (tmp_path / "previous" / "m.pkl").read_text() == "new"
+    rollback_model(str(tmp_path), "m")
+    assert (tmp_path / "m.pkl").read_text() == "new"
+
+
+def test_rollback_without_previous_version(tmp_path):
+    (tmp_path / "m.pkl").write_text("new")
+    with pytest.raises(FileNotFoundError):
+        rollback_model(str(tmp_path), "m")
+    assert os.path.exists(tmp_path / "m.pkl")
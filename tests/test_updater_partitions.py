@@ -0,0 +1,130 @@
+import os
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pydantic")
+pytest.importorskip("filelock")
+
+import updater.updater as updater_module
+from updater.updater import JotunUpdater, hash_with_settings
+from utils.partitions import partition_key
+
+
+class FakeCustomizer:
+
+    def __init__(self):
+        self.trained = []
+
+    def train_and_save(self, model_name, model, dataset, save_path, export_name=None):
+        self.trained.append(export_name or model_name)
+        if export_name:
+            os.makedirs(save_path, exist_ok=True)
+            open(os.path.join(save_path, f"{export_name}.pkl"), "wb").close()
+
+
+class FakeDB:
+
+    def __init__(self):
+        self.hashes = {}
+
+    def insert_hash(self, model_name, hash):
+        self.hashes[model_name] = {"dataset_hash": hash, "previous_dataset_hash": hash}
+
+    def update_hash(self, model_name, current_hash, previous_hash):
+        self.hashes[model_name] = {"dataset_hash": current_hash, "previous_dataset_hash": previous_hash}
+
+    def delete_hash(self, model_name):
+        del self.hashes[model_name]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(updater_module, "partition_key", lambda namespace, deployment: partition_key(namespace, deployment, mode="namespace"))
+    monkeypatch.setattr(updater_module, "PARTITION_MIN_ROWS", 3)
+    return tmp_path
+
+
+def write_dataset(path, rows):
+    lines = ["namespace,deployments,requestsCount,time,replicas"]
+    lines += [ f"{namespace},app,{count},0,1" for namespace, count in rows ]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def run(workdir, db, rows):
+    dataset = workdir / "m.csv"
+    write_dataset(dataset, rows)
+    customize = FakeCustomizer()
+    JotunUpdater({"m": object()}).update_partitions(customize, db, dict(db.hashes), "m", str(dataset), ["namespace", "deployments"])
+    return customize.trained
+
+
+def test_first_run_trains_large_partitions_and_the_global_model(workdir):
+    db = FakeDB()
+    trained = run(workdir, db, [("a", i) for i in range(3)] + [("b", 1)])
+    assert trained == ["a", "m"]
+    assert set(db.hashes) == {"m/a", "m/b"}
+
+
+def test_only_changed_partition_is_retrained(workdir):
+    db = FakeDB()
+    run(workdir, db, [("a", i) for i in range(3)] + [("b", 1)])
+    trained = run(workdir, db, [("a", i) for i in range(4)] + [("b", 1)])
+    assert trained == ["a"]
+
+
+def test_change_of_small_partition_retrains_the_global_model(workdir):
+    db = FakeDB()
+    run(workdir, db, [("a", i) for i in range(3)] + [("b", 1)])
+    trained = run(workdir, db, [("a", i) for i in range(3)] + [("b", 2)])
+    assert trained == ["m"]
+
+
+def test_shrunk_partition_artifact_is_removed(workdir):
+    db = FakeDB()
+    run(workdir, db, [("a", i) for i in range(3)])
+    assert (workdir / "models" / "m" / "a.pkl").exists()
+    trained = run(workdir, db, [("a", 0)])
+    assert trained == ["m"]
+    assert not (workdir / "models" / "m" / "a.pkl").exists()
+
+
+def test_removed_partition_is_forgotten(workdir):
+    db = FakeDB()
+    run(workdir, db, [("a", i) for i in range(3)] + [("b", i) for i in range(3)])
+    trained = run(workdir, db, [("a", i) for i in range(3)])
+    assert trained == ["m"]
+    assert "m/b" not in db.hashes
+    assert not (workdir / "models" / "m" / "b.pkl").exists()
+
+
+def test_unsafe_partition_name_is_served_by_the_global_model(workdir):
+    db = FakeDB()
+    trained = run(workdir, db, [("../evil", i) for i in range(3)])
+    assert trained == ["m"]
+    assert not (workdir / "evil.pkl").exists()
+
+
+def test_changed_partition_settings_reconsider_every_partition(workdir, monkeypatch):
+    monkeypatch.setattr(updater_module, "PARTITION_BY", "namespace")
+    db = FakeDB()
+    run(workdir, db, [("a", i) for i in range(3)])
+    monkeypatch.setattr(updater_module, "PARTITION_MIN_ROWS", 5)
+    trained = run(workdir, db, [("a", i) for i in range(3)])
+    assert trained == ["m"]
+    assert not (workdir / "models" / "m" / "a.pkl").exists()
+
+
+def test_disabled_partitions_are_removed(workdir):
+    db = FakeDB()
+    run(workdir, db, [("a", i) for i in range(3)] + [("b", 1)])
+    db.insert_hash("m", "global")
+    status = JotunUpdater({"m": object()}).remove_partitions(db, dict(db.hashes), "m")
+    assert [ entry["model"] for entry in status ] == ["m/a", "m/b"]
+    assert set(db.hashes) == {"m"}
+    assert not list((workdir / "models" / "m").glob("*.pkl"))
+
+
+def test_hash_is_unchanged_without_partition_settings():
+    assert hash_with_settings("abc", "") == "abc"
+    assert hash_with_settings("abc", "by=namespace;buckets=;min_rows=10") != hash_with_settings("abc", "by=namespace;buckets=;min_rows=5")
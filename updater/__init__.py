@@ -1,8 +1,11 @@
 import os
 import hashlib
+import filelock
 from pathlib import Path
 from customizer.customize import Customizer
 from utils.db import JotunDBUtils
 from sqlite3 import Error
 from typing import Union
-from tabulate import tabulate
\ No newline at end of file
+from utils.partitions import partition_key, is_valid_partition
+from utils.settings import PARTITION_BY, PARTITION_BUCKETS, PARTITION_MIN_ROWS
+from profiling.profiler import profiled
@@ -19,6 +19,52 @@ def get_file_hash(file_path: str, hash_algo: str='sha256' ):
             hash_function.update(chunk)
     return hash_function.hexdigest()
 
+def get_partition_settings() -> str:
+    """
+    Returns the partition settings the partition models are trained with, stored alongside the dataset hashes
+    so that changing them retrains the partitions even when the datasets did not change.
+
+    Returns:
+    - str: The partition settings, e.g. "by=hash;buckets=16;min_rows=10", or "" when partitioning is disabled.
+    """
+    if not PARTITION_BY:
+        return ""
+    buckets = PARTITION_BUCKETS if PARTITION_BY == "hash" else ""
+    return f"by={PARTITION_BY};buckets={buckets};min_rows={PARTITION_MIN_ROWS}"
+
+def hash_with_settings(dataset_hash : str, settings : str) -> str:
+    """
+    Combines a dataset hash with the partition settings. The hash is left unchanged when the settings are
+    empty, so the hashes of the models that are not partitioned stay the plain dataset hashes.
+
+    Parameters:
+    - dataset_hash (str): The hash of the dataset.
+    - settings (str): The partition settings, see `get_partition_settings`.
+
+    Returns:
+    - str: The hash to store in the database.
+    """
+    if not settings:
+        return dataset_hash
+    return hashlib.sha256(f"{dataset_hash}|{settings}".encode("utf-8")).hexdigest()
+
+def remove_partition_model(partitions_dir : str, partition : str):
+    """
+    Deletes the artifact of a partition that is now served by the global model, under the same file lock
+    as the trainer and the loader.
+
+    Parameters:
+    - partitions_dir (str): The directory containing the partition models of a model.
+    - partition (str): The name of the partition. Names that are not a plain file name are ignored.
+    """
+    if not is_valid_partition(partition):
+        return
+    model_file = os.path.join(partitions_dir, f"{partition}.pkl")
+    with filelock.FileLock(f"{model_file}.lock"):
+        if os.path.exists(model_file):
+            os.remove(model_file)
+            print(f"Removed the partition model '{model_file}'.")
+
 class JotunUpdater:
     """
     This class handles updating machine learning models based on changes in the dataset files.
@@ -55,8 +101,97 @@ class JotunUpdater:
         in that directory.
         """
         dataset_dir = os.path.join(os.getcwd(), "datasets")
-        return os.listdir(dataset_dir), dataset_dir
+        return [ dataset for dataset in os.listdir(dataset_dir) if os.path.isfile(os.path.join(dataset_dir, dataset)) ], dataset_dir
         
+    def update_partitions(self, customize : Customizer, db : JotunDBUtils, hashes : dict, model : str, dataset_path : str, partition_columns : list):
+        """
+        Splits the dataset of a model into partitions and retrains only the partitions whose data or
+        partition settings changed.
+
+        Each partition model is saved as `models/<model>/<partition>.pkl` and its dataset hash is tracked
+        under `<model>/<partition>` in the database. Partitions with fewer rows than `JOTUN_PARTITION_MIN_ROWS`,
+        or whose name is not a plain file name, are served by the global model and their artifact is deleted.
+        The artifacts of the partitions removed from the dataset are deleted as well. The global model is
+        retrained whenever a partition it serves changes, or when partitions are added or removed.
+
+        Parameters:
+        - customize (Customizer): The customizer used to train the models.
+        - db (JotunDBUtils): The database holding the dataset hashes.
+        - hashes (dict): The dataset hashes currently stored in the database.
+        - model (str): The name of the model.
+        - dataset_path (str): The path to the dataset of the model.
+        - partition_columns (list): The dataset columns holding the namespace and the deployment name.
+
+        Returns:
+        - list: The update status of each changed partition.
+        """
+        from pandas import read_csv, Series   # only needed for training, keep it out of the startup imports
+        df = read_csv(dataset_path)
+        keys = Series([ partition_key(*fields) for fields in zip(*(df[column].astype(str) for column in partition_columns)) ], index=df.index)
+        models_dir = os.path.join(os.getcwd(), "models")
+        partitions_dir = os.path.join(models_dir, model)
+        settings = get_partition_settings()
+        partitions_update_status = []
+        partitions_in_dataset = set()
+        isGlobalOutdated = False
+
+        for key, partition in df.groupby(keys):
+            hash_name = f"{model}/{key}"
+            partitions_in_dataset.add(hash_name)
+            partition_hash = hash_with_settings(hashlib.sha256(partition.to_csv(index=False).encode("utf-8")).hexdigest(), settings)
+            previous_hash = hashes[hash_name]["dataset_hash"] if hash_name in hashes else ""
+            if partition_hash == previous_hash:
+                continue
+            if not previous_hash:
+                isGlobalOutdated = True         # the fallback has to know the new namespaces and deployments
+            if not is_valid_partition(key) or len(partition) < PARTITION_MIN_ROWS:
+                print(f"Partition is served by the global model :: {hash_name}")
+                remove_partition_model(partitions_dir, key)
+                isGlobalOutdated = True
+            else:
+                print(f"Proceeding to update the following partition :: {hash_name}")
+                customize.train_and_save(model, self.models[model], partition.reset_index(drop=True), partitions_dir, key)
+            if previous_hash:
+                db.update_hash(hash_name, partition_hash, previous_hash)
+            else:
+                db.insert_hash(hash_name, partition_hash)
+            partitions_update_status.append({"model": hash_name, "current_hash": partition_hash[0:8], "previous_hash": previous_hash[0:8]})
+
+        for hash_name in [ name for name in hashes if name.startswith(f"{model}/") and name not in partitions_in_dataset ]:
+            print(f"Partition was removed from the dataset :: {hash_name}")
+            remove_partition_model(partitions_dir, hash_name[len(model) + 1:])
+            db.delete_hash(hash_name)
+            isGlobalOutdated = True
+            partitions_update_status.append({"model": hash_name, "current_hash": "", "previous_hash": hashes[hash_name]["dataset_hash"][0:8]})
+
+        if isGlobalOutdated:
+            print(f"Partitions served by the global model changed, updating the global fallback model :: {model}")
+            customize.train_and_save(model, self.models[model], dataset_path, models_dir)
+        return partitions_update_status
+
+    def remove_partitions(self, db : JotunDBUtils, hashes : dict, model : str):
+        """
+        Deletes every partition model of a model and their dataset hashes, once the model is no longer
+        partitioned, so that turning the partitioned mode back on does not serve stale partition models.
+
+        Parameters:
+        - db (JotunDBUtils): The database holding the dataset hashes.
+        - hashes (dict): The dataset hashes currently stored in the database.
+        - model (str): The name of the model.
+
+        Returns:
+        - list: The update status of each removed partition.
+        """
+        partitions_dir = os.path.join(os.getcwd(), "models", model)
+        partitions_update_status = []
+        for hash_name in [ name for name in hashes if name.startswith(f"{model}/") ]:
+            db.delete_hash(hash_name)
+            partitions_update_status.append({"model": hash_name, "current_hash": "", "previous_hash": hashes[hash_name]["dataset_hash"][0:8]})
+        for model_file in Path(partitions_dir).glob("*.pkl"):
+            remove_partition_model(partitions_dir, model_file.stem)
+        return partitions_update_status
+
+    @profiled("update")
     def update(self):
         """
         Checks for updates in the dataset files, compares their hashes with the stored hashes in the 
@@ -80,6 +215,10 @@ class JotunUpdater:
         print("Fetching all dataset files...")
         dataset_files, dataset_dir = self.fetch_all_dataset()
 
+        for dataset in [ dataset for dataset in dataset_files if Path(dataset).stem not in self.models ]:
+            print(f"No model is served by this worker for the dataset, skipping :: {Path(dataset).stem}")
+            dataset_files.remove(dataset)
+
         print("Calculating hash for all datasets...")
         latest_calc_details = { Path(dataset).stem: { "hash": get_file_hash(os.path.join(dataset_dir, dataset)), "filepath": os.path.join(dataset_dir, dataset) } for dataset in dataset_files }
 
@@ -89,21 +228,31 @@ class JotunUpdater:
                 isHashNotPresent = True
             else:
                 current_db_hash = hashes[model]["dataset_hash"]
-           
-            if details["hash"] != current_db_hash:
+
+            customize = Customizer()
+            partition_columns = customize.get_partition_columns(model) if PARTITION_BY else None
+            # The partition settings are part of the stored hash, so enabling, disabling or changing the
+            # partitioned mode updates the model even when its dataset did not change.
+            dataset_hash = hash_with_settings(details["hash"], get_partition_settings() if partition_columns else "")
+
+            if dataset_hash != current_db_hash:
                 print(f"Proceeding to update the following model :: {model}")
-                customize = Customizer()
                 isValidationSuccess = customize.validate(model)
                 if not isValidationSuccess:
                     return Exception(f"Validation failed for the following model :: {model}")
-                customize.train_and_save(model, self.models[f'{model}'], details["filepath"], os.path.join(os.getcwd(), "models"))
+                if partition_columns:
+                    models_update_status.extend(self.update_partitions(customize, db, hashes, model, details["filepath"], partition_columns))
+                else:
+                    customize.train_and_save(model, self.models[f'{model}'], details["filepath"], os.path.join(os.getcwd(), "models"))
+                    models_update_status.extend(self.remove_partitions(db, hashes, model))
                 isUpdated = True
                 if isHashNotPresent:
-                    db.insert_hash(model, details["hash"])
+                    db.insert_hash(model, dataset_hash)
                 else:
-                    db.update_hash(model, details["hash"], current_db_hash)
-                models_update_status.append({"model": model, "current_hash": details["hash"][0:8], "previous_hash": current_db_hash[0:8]})
+                    db.update_hash(model, dataset_hash, current_db_hash)
+                models_update_status.append({"model": model, "current_hash": dataset_hash[0:8], "previous_hash": current_db_hash[0:8]})
             else:
                 print(f"No update found :: {model}")
+        from tabulate import tabulate   # only needed for the report, keep it out of the startup imports
         print(tabulate(models_update_status, headers="keys", tablefmt="grid"))        
         return isUpdated
@@ -1,4 +1,8 @@
+import os
+import re
+import time
+import zlib
 import sqlite3
 from sqlite3 import Error
 from typing import Union
-from contextlib import contextmanager
\ No newline at end of file
+from contextlib import contextmanager
@@ -153,5 +153,21 @@ class JotunDBUtils:
         except Error as e:
             return e
 
-    
-    
\ No newline at end of file
+    def delete_hash(self, model_name : str) -> Union[None, Error]:
+        """
+        Deletes the hash entry of a model from the 'hash_tracker' table.
+
+        Parameters:
+            model_name (str): The name of the model whose hash entry needs to be deleted.
+
+        Returns:
+            None: If the deletion is successful.
+            Error: If an exception occurs during the deletion operation, the error is returned.
+        """
+        try:
+            sql_delete = '''DELETE FROM hash_tracker WHERE model_name = ?;'''
+            with self.connection:
+                self.connection.execute(sql_delete, (model_name,))
+                print(f"Model '{model_name}' details deleted successfully.")
+        except Error as e:
+            return e
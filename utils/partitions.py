@@ -0,0 +1,42 @@
+from utils import *
+from utils.settings import PARTITION_BY, PARTITION_BUCKETS
+
+PARTITION_NAME_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+def is_valid_partition(partition : str) -> bool:
+    """
+    Checks whether a partition name can safely be used as a file name.
+
+    Partition names come from the dataset and from the requests, so anything that is not a plain file name
+    component (path separators, "..", empty names, ...) is rejected and served by the global model instead.
+
+    Parameters:
+    - partition (str): The partition name.
+
+    Returns:
+    - bool: True if the partition name is a plain file name component, False otherwise.
+    """
+    return bool(PARTITION_NAME_PATTERN.fullmatch(partition)) and ".." not in partition
+
+def partition_key(namespace : str, deployment : str, mode : str = PARTITION_BY, buckets : int = PARTITION_BUCKETS) -> str:
+    """
+    Returns the name of the partition a namespace and deployment belong to.
+
+    Parameters:
+    - namespace (str): The namespace of the deployment.
+    - deployment (str): The name of the deployment.
+    - mode (str): "namespace" to partition by namespace, or "hash" to partition by a stable hash of the
+      namespace and the deployment name into a fixed number of buckets.
+    - buckets (int): The number of buckets used by the "hash" mode.
+
+    Returns:
+    - str: The partition name, which is also used as the file name of the partition model.
+
+    Raises:
+    - ValueError: If the partition mode is not supported.
+    """
+    if mode == "namespace":
+        return namespace
+    if mode == "hash":
+        return f"bucket-{zlib.crc32(f'{namespace}/{deployment}'.encode('utf-8')) % buckets:03d}"
+    raise ValueError(f"Unsupported partition mode :: {mode}")
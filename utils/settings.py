@@ -0,0 +1,81 @@
+from utils import *
+
+def env_flag(name : str, default : bool = False) -> bool:
+    """
+    Reads a boolean flag from the environment.
+
+    Parameters:
+    - name (str): The name of the environment variable.
+    - default (bool): The value returned when the variable is not set.
+
+    Returns:
+    - bool: True for "1", "true", "yes" or "on" (case-insensitive), False for any other value.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def env_int(name : str, default : int) -> int:
+    """
+    Reads an integer setting from the environment.
+
+    Parameters:
+    - name (str): The name of the environment variable.
+    - default (int): The value returned when the variable is not set.
+
+    Returns:
+    - int: The parsed value of the environment variable.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+def env_float(name : str, default : float) -> float:
+    """
+    Reads a decimal setting from the environment.
+
+    Parameters:
+    - name (str): The name of the environment variable.
+    - default (float): The value returned when the variable is not set.
+
+    Returns:
+    - float: The parsed value of the environment variable.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return float(value)
+
+# Serve the models already on disk as soon as they are loaded and run the first
+# dataset update check in the background instead of blocking the startup.
+FAST_START = env_flag("JOTUN_FAST_START")
+
+# Directory of additional model implementations, one `<model_name>.py` file per model.
+PLUGIN_DIR = os.getenv("JOTUN_PLUGIN_DIR")
+
+# Models are split across workers by name. Each worker serves the models whose
+# name hashes to its SHARD_INDEX out of SHARD_COUNT.
+SHARD_COUNT = env_int("JOTUN_SHARD_COUNT", 1)
+SHARD_INDEX = env_int("JOTUN_SHARD_INDEX", 0)
+
+# Optional partitioned mode, one small model per "namespace" or per "hash" bucket of
+# namespace and deployment. Disabled when unset.
+PARTITION_BY = os.getenv("JOTUN_PARTITION_BY", "").strip().lower()
+if PARTITION_BY not in ("", "namespace", "hash"):
+    raise ValueError(f"Invalid JOTUN_PARTITION_BY value [ {PARTITION_BY} ]. Valid values are 'namespace' and 'hash', or unset to disable partitioning.")
+PARTITION_BUCKETS = env_int("JOTUN_PARTITION_BUCKETS", 16)
+PARTITION_MIN_ROWS = env_int("JOTUN_PARTITION_MIN_ROWS", 10)
+PARTITION_CACHE_SIZE = env_int("JOTUN_PARTITION_CACHE_SIZE", 32)
+
+# After a retrain the previous model version keeps running as a shadow for SHADOW_WINDOW_MINUTES,
+# on SHADOW_SAMPLE_RATE of the predictions, to compare it with the new version. 0 disables it.
+SHADOW_WINDOW_MINUTES = env_float("JOTUN_SHADOW_WINDOW_MINUTES", 60)
+SHADOW_SAMPLE_RATE = env_float("JOTUN_SHADOW_SAMPLE_RATE", 0.1)
+SHADOW_QUEUE_SIZE = env_int("JOTUN_SHADOW_QUEUE_SIZE", 1000)
+# Number of recent predictions kept to match the actual values ingested later.
+TRACKED_PREDICTIONS = env_int("JOTUN_TRACKED_PREDICTIONS", 10000)
+
+# Directory where the on-demand CPU and allocation profiles are written.
+PROFILE_DIR = os.getenv("JOTUN_PROFILE_DIR", "./profiles")
@@ -0,0 +1,51 @@
+from utils import *
+
+class StartupTimings:
+    """
+    Records how long each phase of the application startup takes.
+
+    Description:
+    The recorded phases (imports, model loading, prerequisites, initial update, ...) are printed
+    as soon as they finish and are kept in memory so they can be exposed through the API. This helps
+    to find out what a pod is waiting on before it reports ready.
+
+    Methods:
+        - phase: Context manager that measures the duration of the wrapped block.
+        - record: Stores an already measured duration.
+        - as_dict: Returns the recorded durations in seconds.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name : str):
+        """
+        Measures the duration of the wrapped block and stores it under the given phase name.
+
+        Parameters:
+        - name (str): The name of the startup phase.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name : str, seconds : float):
+        """
+        Stores the duration of a startup phase.
+
+        Parameters:
+        - name (str): The name of the startup phase.
+        - seconds (float): The duration of the phase in seconds.
+        """
+        self.phases[name] = round(seconds, 3)
+        print(f"Startup phase '{name}' took {seconds:.3f}s")
+
+    def as_dict(self) -> dict:
+        """
+        Returns:
+        - dict: The recorded phase names mapped to their duration in seconds.
+        """
+        return dict(self.phases)